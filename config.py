@@ -4,13 +4,16 @@ from zoneinfo import ZoneInfo
 
 DEFAULT_USER = os.getenv("CHESS_USERNAME")
 
+# Chess.com asks API clients to include contact details in the User-Agent.
+USER_AGENT = "chess-sessions/1.0"
+if os.getenv("CHESS_CONTACT"):
+    USER_AGENT += f" (contact: {os.getenv('CHESS_CONTACT')})"
+
 LOCAL_TZ = ZoneInfo("America/New_York")
 
 CACHE_ROOT = os.getenv(
     "CHESS_SESSIONS_CACHE_DIR", os.path.join(os.path.dirname(__file__), "json")
 )
 
-PGN_DATE_RE = re.compile(r'\[UTCDate "([\d\.]+)"\]')
-PGN_START_RE = re.compile(r'\[UTCTime "([\d:]+)"\]')
-PGN_END_RE = re.compile(r'\[EndTime "([\d:]+)"\]')
-PGN_TAG_RE = re.compile(r'\[([^\s]+) "([^\"]*)"\]')
\ No newline at end of file
+PGN_TAG_RE = re.compile(r'\[([^\s]+) "([^\"]*)"\]')
+PGN_TIME_TAG_RE = re.compile(r'\[(UTCDate|UTCTime|EndTime) "([\d.:]+)"\]')
@@ -1,12 +1,104 @@
+import atexit
 import datetime as dt
+import gzip
+import heapq
+import itertools
 import json
 import os
 import shutil
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from functools import lru_cache
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from config import CACHE_ROOT, LOCAL_TZ
-from parsing import dprint, parse_pgn_times, get_game_result
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pycountry
+except ImportError:
+    pycountry = None
+
+from config import CACHE_ROOT, LOCAL_TZ, USER_AGENT
+from parsing import GameRow, dprint, get_game_times, get_game_result
+
+
+# ========================
+# HTTP session
+# ========================
+
+FETCH_WORKERS = 3
+RETRY_ATTEMPTS = 3
+PREFETCH_MONTHS = 3
+LOOKUP_WORKERS = 4
+
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = USER_AGENT
+# Every worker gets its own keep-alive connection to api.chess.com, so
+# concurrent lookups never discard sockets because the pool is full.
+# Rate limiting (429) and transient 5xx answers are retried with exponential
+# backoff, waiting out any Retry-After the server sends; the last response is
+# returned so raise_for_status still applies.
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=max(FETCH_WORKERS, LOOKUP_WORKERS),
+    max_retries=Retry(
+        total=RETRY_ATTEMPTS,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+))
+
+
+def _fetch_json(url):
+    """GET a URL and return its decoded JSON body, or None on any failure."""
+    try:
+        resp = SESSION.get(url, timeout=10)
+        resp.raise_for_status()
+        return _json_loads(resp.content)
+    except Exception:
+        return None
+
+
+def _fetch_json_many(urls):
+    """Fetch several JSON endpoints concurrently; results follow `urls` order."""
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=LOOKUP_WORKERS) as pool:
+        return list(pool.map(_fetch_json, urls))
+
+
+# ========================
+# JSON helpers
+# ========================
+
+def _json_loads(data):
+    """Decode JSON from str/bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Encode JSON to UTF-8 bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _read_json_file(path: str):
+    """Decode a JSON file."""
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
 
 
 # ========================
@@ -16,31 +108,146 @@ from parsing import dprint, parse_pgn_times, get_game_result
 def _cache_path(username: str, year: int, month: int) -> str:
     safe_user = (username or "").strip().lower()
     user_dir = os.path.join(CACHE_ROOT, safe_user)
-    return os.path.join(user_dir, f"{year}-{month:02d}.json")
+    return os.path.join(user_dir, f"{year}-{month:02d}.jsonl.gz")
+
+
+# Month caches are gzip'd JSON Lines: one game object per line, plus `{"_meta": {...}}`
+# records holding everything else in the payload (etag, last_modified, ...).
+# The last meta record wins, so an update can append its new games and a fresh
+# meta line (as another gzip member) instead of rewriting the file.
+
+CACHE_COMPRESSLEVEL = 6
+
+
+def _meta_line(payload: dict) -> bytes:
+    meta = {k: v for k, v in payload.items() if k != "games"}
+    return _json_dumps({"_meta": meta}) + b"\n"
+
+
+def _game_lines(games) -> bytes:
+    return b"".join(_json_dumps(g) + b"\n" for g in games)
+
+
+def _read_jsonl_month(path: str) -> dict:
+    """Decode a month cache file back into an API-shaped payload dict."""
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    if not data:
+        raise ValueError("empty file")
+    games = []
+    meta = {}
+    for line in data.splitlines():
+        if not line:
+            continue
+        obj = _json_loads(line)
+        if "_meta" in obj:
+            meta = obj["_meta"]
+        else:
+            games.append(obj)
+    return {**meta, "games": games}
+
+
+@lru_cache(maxsize=128)
+def _read_cached_month_raw(path: str, mtime_ns: int):
+    """Decode a month cache file. Keyed on mtime so a rewritten file is re-read.
+
+    The returned payload is shared between callers and must not be mutated.
+    """
+    return _read_jsonl_month(path)
 
 
 def _read_cached_month(username: str, year: int, month: int, verbose: bool = False):
     path = _cache_path(username, year, month)
-    if not os.path.exists(path):
-        return None
+    with _PENDING_LOCK:
+        pending = _PENDING_WRITES.get(path)
+    if pending is not None:
+        dprint(verbose, f"Cache hit (pending write): {path}")
+        return pending[0]
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return _migrate_legacy_month(path, verbose)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            dprint(verbose, f"Cache hit: {path}")
-            return json.load(f)
+        payload = _read_cached_month_raw(path, mtime_ns)
+        dprint(verbose, f"Cache hit: {path}")
+        return payload
     except Exception as e:
         dprint(verbose, f"Cache read failed ({path}): {e}. Will refetch.")
         return None
 
 
-def _write_cached_month(username, year, month, payload, verbose=False):
+# Month payloads waiting to be written: {path: (payload, on_disk, verbose)}.
+# `on_disk` is how many leading games of `payload` are already in the file
+# (so only the rest need appending), or None for a full rewrite. Flushed
+# together at process exit so a cold backfill does one batch of
+# directory/rename work instead of one per fetched month.
+_PENDING_WRITES: dict[str, tuple] = {}
+_PENDING_LOCK = threading.Lock()
+
+
+# Month caches from the original layout (plain JSON payloads, <YYYY-MM>.json)
+# are read once, queued in the current format, and deleted after the new file
+# is written.
+_LEGACY_PATHS: dict[str, str] = {}
+
+
+def _migrate_legacy_month(path: str, verbose: bool = False):
+    """Return the payload of a legacy .json cache for `path`, queued for rewriting."""
+    legacy = path[:-len(".jsonl.gz")] + ".json"
+    if not os.path.exists(legacy):
+        return None
+    try:
+        payload = _read_json_file(legacy)
+    except Exception as e:
+        dprint(verbose, f"Legacy cache read failed ({legacy}): {e}")
+        payload = None
+    if not isinstance(payload, dict) or not isinstance(payload.get("games"), list):
+        # Unreadable leftover: drop it now, the month gets refetched.
+        try:
+            os.remove(legacy)
+        except OSError:
+            pass
+        return None
+    dprint(verbose, f"Cache hit (legacy, migrating): {legacy}")
+    with _PENDING_LOCK:
+        _PENDING_WRITES.setdefault(path, (payload, None, verbose))
+        _LEGACY_PATHS[path] = legacy
+    return payload
+
+
+def _extends(games: list, base_games: list, n: int) -> bool:
+    """True if the first n games of `games` are the first n of `base_games`."""
+    if len(games) < n or len(base_games) < n:
+        return False
+    return n == 0 or games[n - 1].get("url") == base_games[n - 1].get("url")
+
+
+def _write_cached_month(username, year, month, payload, verbose=False, base=None):
+    """Queue `payload` for writing. `base` is the cached payload it replaces."""
     path = _cache_path(username, year, month)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    games = payload.get("games", [])
+    with _PENDING_LOCK:
+        prev = _PENDING_WRITES.get(path)
+        if prev is not None:
+            base, on_disk = prev[0], prev[1]
+        elif isinstance(base, dict):
+            on_disk = len(base.get("games", []))
+        else:
+            on_disk = None
+        if on_disk is not None and not _extends(games, base.get("games", []), on_disk):
+            on_disk = None
+        _PENDING_WRITES[path] = (payload, on_disk, verbose)
+
+
+def _write_file_atomic(path, payload, verbose=False):
     tmp = f"{path}.tmp"
     try:
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False)
+        with gzip.open(tmp, "wb", compresslevel=CACHE_COMPRESSLEVEL) as f:
+            f.write(_game_lines(payload.get("games", [])))
+            f.write(_meta_line(payload))
         os.replace(tmp, path)
         dprint(verbose, f"Cached: {path}")
+        return True
     except Exception as e:
         dprint(verbose, f"Cache write failed ({path}): {e}")
         try:
@@ -48,13 +255,143 @@ def _write_cached_month(username, year, month, payload, verbose=False):
                 os.remove(tmp)
         except Exception:
             pass
+        return False
+
+
+def _append_file(path, payload, on_disk, verbose=False):
+    try:
+        with gzip.open(path, "ab", compresslevel=CACHE_COMPRESSLEVEL) as f:
+            f.write(_game_lines(payload.get("games", [])[on_disk:]))
+            f.write(_meta_line(payload))
+        dprint(verbose, f"Cached (appended): {path}")
+        return True
+    except Exception as e:
+        dprint(verbose, f"Cache append failed ({path}): {e}")
+        return False
+
+
+# Per-user _index.json summarising the cached months, so callers can plan
+# which months to read without opening each one:
+# {"months": {"2024-03": {"games": 87, "current": false}}}
+
+def _index_path(user_dir: str) -> str:
+    return os.path.join(user_dir, "_index.json")
+
+
+def _read_month_index(username: str) -> dict:
+    """Return the cached-month summaries for a user, keyed by "YYYY-MM"."""
+    user_dir = os.path.join(CACHE_ROOT, (username or "").strip().lower())
+    try:
+        return _read_json_file(_index_path(user_dir)).get("months", {})
+    except Exception:
+        return {}
+
+
+def _update_month_index(user_dir: str, written: dict) -> None:
+    """Fold freshly written {path: payload} month files into the user's index."""
+    path = _index_path(user_dir)
+    try:
+        index = _read_json_file(path)
+    except Exception:
+        index = {}
+    months = index.setdefault("months", {})
+    for month_path, payload in written.items():
+        games = payload.get("games", [])
+        months[os.path.basename(month_path).split(".")[0]] = {
+            "games": len(games),
+            "current": bool(payload.get("current")),
+        }
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps(index))
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+# Serialises flushes so a background flush and the exit-time one never write
+# the same file at once.
+_FLUSH_LOCK = threading.Lock()
+
+
+def flush_pending_writes():
+    """Write every buffered month payload to disk."""
+    with _FLUSH_LOCK:
+        # Entries stay visible to readers until their file is written; a payload
+        # re-queued meanwhile is left for the next flush.
+        with _PENDING_LOCK:
+            pending = dict(_PENDING_WRITES)
+
+        written = {}
+        for user_dir in {os.path.dirname(path) for path in pending}:
+            os.makedirs(user_dir, exist_ok=True)
+            written[user_dir] = {}
+        for path, entry in pending.items():
+            payload, on_disk, verbose = entry
+            if on_disk is not None and os.path.exists(path):
+                ok = _append_file(path, payload, on_disk, verbose)
+            else:
+                ok = _write_file_atomic(path, payload, verbose)
+            if ok:
+                written[os.path.dirname(path)][path] = payload
+                with _PENDING_LOCK:
+                    legacy = _LEGACY_PATHS.pop(path, None)
+                if legacy:
+                    try:
+                        os.remove(legacy)
+                    except OSError:
+                        pass
+            with _PENDING_LOCK:
+                cur = _PENDING_WRITES.get(path)
+                if cur is entry:
+                    del _PENDING_WRITES[path]
+                elif cur is not None:
+                    # Re-queued mid-flush: the file now holds `payload` (or,
+                    # after a failure, something unknown), so rebase the
+                    # newer entry onto it.
+                    n = len(payload.get("games", []))
+                    if not (ok and _extends(cur[0].get("games", []), payload.get("games", []), n)):
+                        n = None
+                    _PENDING_WRITES[path] = (cur[0], n, cur[2])
+        for user_dir, files in written.items():
+            if files:
+                _update_month_index(user_dir, files)
+
+
+def flush_pending_writes_async() -> threading.Thread:
+    """Start flushing buffered months on a background thread and return it.
+
+    Lets callers overlap the disk writes with rendering once fetching is done;
+    the exit-time flush waits for it.
+    """
+    writer = threading.Thread(target=flush_pending_writes)
+    writer.start()
+    return writer
+
+
+atexit.register(flush_pending_writes)
 
 
 def clear_user_cache(username: str):
     safe_user = username.strip().lower()
     user_cache_dir = os.path.join(CACHE_ROOT, safe_user)
+    with _PAST_MONTH_LOCK:
+        _PAST_MONTH_GAMES.clear()
+    with _PENDING_LOCK:
+        for path in [p for p in _PENDING_WRITES if os.path.dirname(p) == user_cache_dir]:
+            del _PENDING_WRITES[path]
+            _LEGACY_PATHS.pop(path, None)
     if os.path.isdir(user_cache_dir):
-        shutil.rmtree(user_cache_dir)
+        # The cache dir is flat, so a direct scan is enough; fall back to a
+        # full tree removal if anything nested turns up.
+        try:
+            with os.scandir(user_cache_dir) as it:
+                for entry in it:
+                    os.remove(entry.path)
+            os.rmdir(user_cache_dir)
+        except OSError:
+            shutil.rmtree(user_cache_dir)
         print(f"Cache cleared: {user_cache_dir}")
     else:
         print("No cache to clear.")
@@ -64,25 +401,108 @@ def clear_user_cache(username: str):
 # Fetching
 # ========================
 
-def fetch_month_games(username, year, month, verbose=False):
-    today = dt.datetime.now(LOCAL_TZ).date()
-    is_current_month = (year == today.year and month == today.month)
-
-    if not is_current_month:
-        cached = _read_cached_month(username, year, month, verbose)
-        if isinstance(cached, dict):
-            return cached.get("games", [])
+def _get_month(username, year, month, cached=None, verbose=False):
+    """Download one monthly archive and return the decoded payload.
 
+    If `cached` holds validators from an earlier download the request is made
+    conditional, and None is returned when the server answers 304.
+    """
     url = f"https://api.chess.com/pub/player/{username}/games/{year}/{month:02d}"
-    dprint(verbose, f"Fetching {url}")
-
-    resp = requests.get(url, headers={"User-Agent": "chess-sessions/1.0"}, timeout=10)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    dprint(verbose, f"Fetching {url}{' (conditional)' if headers else ''}")
+
+    resp = SESSION.get(url, headers=headers, timeout=10)
+    if resp.status_code == 304:
+        dprint(verbose, f"Not modified: {url}")
+        return None
     resp.raise_for_status()
 
-    payload = resp.json()
+    payload = _json_loads(resp.content)
+    if isinstance(payload, dict):
+        payload["etag"] = resp.headers.get("ETag")
+        # Without a Last-Modified, the server's Date (or failing that, the
+        # fetch time) is when this copy was current; the cache file's mtime is
+        # not, since it is written later at flush.
+        payload["last_modified"] = (
+            resp.headers.get("Last-Modified")
+            or resp.headers.get("Date")
+            or formatdate(usegmt=True)
+        )
+    return payload
+
+
+def fetch_month_games(username, year, month, today_ym=None, verbose=False):
+    """Return the games archived for one month as a tuple.
+
+    Past months are final, so their results are also memoized in-process;
+    the current month is always revalidated.
+    """
+    if today_ym is None:
+        today = dt.datetime.now(LOCAL_TZ).date()
+        today_ym = (today.year, today.month)
+    if (year, month) == today_ym:
+        return tuple(_fetch_month_games_impl(username, year, month, True, verbose))
+    return _fetch_past_month_games(username, year, month, verbose)
+
+
+# Past months' games, memoized per (normalized username, year, month). The
+# username is normalized like _cache_path and verbose is not part of the key,
+# so "Me" and "me" or verbose and quiet calls share one entry.
+_PAST_MONTH_GAMES: OrderedDict = OrderedDict()
+_PAST_MONTH_LIMIT = 64
+_PAST_MONTH_LOCK = threading.Lock()
+
+
+def _fetch_past_month_games(username, year, month, verbose=False):
+    key = ((username or "").strip().lower(), year, month)
+    with _PAST_MONTH_LOCK:
+        games = _PAST_MONTH_GAMES.get(key)
+        if games is not None:
+            _PAST_MONTH_GAMES.move_to_end(key)
+            return games
+    games = tuple(_fetch_month_games_impl(username, year, month, False, verbose))
+    with _PAST_MONTH_LOCK:
+        _PAST_MONTH_GAMES[key] = games
+        _PAST_MONTH_GAMES.move_to_end(key)
+        if len(_PAST_MONTH_GAMES) > _PAST_MONTH_LIMIT:
+            _PAST_MONTH_GAMES.popitem(last=False)
+    return games
+
+
+def _fetch_month_games_impl(username, year, month, is_current_month, verbose=False):
+    # Past months are final once cached. A month cached while it was still
+    # current ("current": true) is revalidated like the current month.
+    cached = _read_cached_month(username, year, month, verbose)
+    if not isinstance(cached, dict):
+        cached = None
+    elif not (is_current_month or cached.get("current")):
+        return cached.get("games", [])
+
+    try:
+        payload = _get_month(username, year, month, cached, verbose)
+    except requests.RequestException as e:
+        # Retries (including Retry-After waits) are exhausted; a stale copy
+        # beats aborting the whole run.
+        if cached is None:
+            raise
+        dprint(verbose, f"Revalidation failed for {year}-{month:02d}, using cache: {e}")
+        return cached.get("games", [])
+    if payload is None:
+        if cached.get("current") != is_current_month:
+            _write_cached_month(
+                username, year, month, dict(cached, current=is_current_month),
+                verbose, base=cached,
+            )
+        return cached.get("games", [])
+
     if isinstance(payload, dict):
-        if not is_current_month:
-            _write_cached_month(username, year, month, payload, verbose)
+        payload["current"] = is_current_month
+        _write_cached_month(username, year, month, payload, verbose, base=cached)
         return payload.get("games", [])
 
     return []
@@ -113,121 +533,322 @@ def month_iter_backwards(end_date: dt.date, max_months: int = 36):
 
 def is_skippable(game: dict) -> bool:
     """Return True for coach/training/odd entries we want to ignore."""
-    white = game.get("white", {}).get("username", "").lower()
-    black = game.get("black", {}).get("username", "").lower()
-    pgn = game.get("pgn", "")
-    if 'Event "Play vs Coach"' in pgn:
-        return True
-    if white == "chess.com" or black == "chess.com":
+    # Cheap username checks first; only scan the PGN text if they pass.
+    white = game.get("white", {}).get("username", "")
+    black = game.get("black", {}).get("username", "")
+    if white.lower() == "chess.com" or black.lower() == "chess.com":
         return True
-    return False
+    pgn = game.get("pgn")
+    return bool(pgn) and 'Event "Play vs Coach"' in pgn
 
 
 def fetch_most_recent_games(username, n: int, verbose: bool = False):
     if n <= 0:
         return []
 
-    now = dt.datetime.now(LOCAL_TZ)
-    parsed = []
-    for y, m in month_iter_backwards(now.date()):
-        games = fetch_month_games(username, y, m, verbose)
-        for g in games:
-            if is_skippable(g):
-                continue
-            start, end = parse_pgn_times(g.get("pgn", ""), verbose)
-            if not start or not end:
-                continue
-            res, side = get_game_result(g, username)
-            parsed.append((start, end, res, side, g))
-        if len(parsed) >= n:
+    today = dt.datetime.now(LOCAL_TZ).date()
+    today_ym = (today.year, today.month)
+
+    # Use the cache index to size the first batch: every month back to the
+    # one where the cached game counts reach n (or the first unindexed one).
+    # Those months are known to be needed, so they are fetched concurrently;
+    # anything older is only requested once the months so far fall short of n,
+    # so a cold run asks for no archive it does not use.
+    index = _read_month_index(username)
+    first_batch = 0
+    total = 0
+    for y, m in month_iter_backwards(today):
+        first_batch += 1
+        entry = index.get(f"{y}-{m:02d}")
+        if entry is None:
+            break
+        total += entry.get("games", 0)
+        if total >= n:
             break
 
-    parsed.sort(key=lambda x: x[0])
-    return parsed[-n:]
+    months = month_iter_backwards(today)
+    # Min-heap of the n newest (start, seq, end, game) seen so far; seq breaks
+    # ties so game dicts are never compared.
+    newest = []
+    seq = itertools.count()
+    pool = ThreadPoolExecutor(max_workers=PREFETCH_MONTHS)
+    try:
+        pending = deque()
+        for y, m in months:
+            pending.append(pool.submit(fetch_month_games, username, y, m, today_ym, verbose))
+            if len(pending) >= first_batch:
+                break
+
+        while pending:
+            games = pending.popleft().result()
+            for g in games:
+                if is_skippable(g):
+                    continue
+                start, end = get_game_times(g, verbose)
+                if not start or not end:
+                    continue
+                item = (start, next(seq), end, g)
+                if len(newest) < n:
+                    heapq.heappush(newest, item)
+                elif start > newest[0][0]:
+                    heapq.heapreplace(newest, item)
+            if len(newest) >= n:
+                break
+            if not pending:
+                nxt = next(months, None)
+                if nxt is not None:
+                    pending.append(pool.submit(fetch_month_games, username, *nxt, today_ym, verbose))
+    finally:
+        # Return as soon as n games are in hand. An indexed month still in
+        # flight (possibly sleeping out a Retry-After) is not waited for here,
+        # though interpreter exit still joins it; its cache write is picked up
+        # by the exit flush.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # Result extraction is deferred until only the selected games remain.
+    parsed = []
+    for start, _, end, g in sorted(newest):
+        res, side = get_game_result(g, username)
+        parsed.append(GameRow(start, end, res, side, g))
+    return parsed
 
 
-def fetch_games_for_range(username, start_date, end_date, verbose=False):
-    all_games = []
-    for y, m in month_iter(start_date, end_date):
-        all_games.extend(fetch_month_games(username, y, m, verbose))
+def _is_known_empty(entry) -> bool:
+    return bool(entry) and entry.get("games") == 0 and not entry.get("current")
+
+
+def fetch_games_for_months(username, months, verbose=False):
+    """Fetch the given (year, month) pairs concurrently, preserving their order."""
+    today = dt.datetime.now(LOCAL_TZ).date()
+    today_ym = (today.year, today.month)
+
+    # Months the index knows to be finished and empty (e.g. before the account
+    # existed) need neither a cache read nor a request.
+    index = _read_month_index(username)
+    months = [
+        (y, m) for y, m in months
+        if (y, m) == today_ym
+        or not _is_known_empty(index.get(f"{y}-{m:02d}"))
+    ]
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        results = pool.map(
+            lambda ym: fetch_month_games(username, ym[0], ym[1], today_ym, verbose), months
+        )
+        all_games = []
+        for games in results:
+            all_games.extend(games)
     return all_games
 
 
+def fetch_games_for_range(username, start_date, end_date, verbose=False):
+    return fetch_games_for_months(username, month_iter(start_date, end_date), verbose)
+
+
 # ========================
 # Country code lookup
 # ========================
 
 def _country_cache_path(username: str) -> str:
     safe_user = (username or "").strip().lower()
-    return os.path.join(CACHE_ROOT, safe_user, "country_cache.json")
+    return os.path.join(CACHE_ROOT, safe_user, "country_cache.jsonl")
+
+
+# The country cache is an append-only JSON Lines log: {"u": user, "c": code}
+# records a player's country code and {"k": code, "n": name} a country's name,
+# with later lines winning. New lookups are appended; once the log holds more
+# than twice as many lines as live entries it is rewritten in compacted form.
+
+def _country_entry_lines(player_country: dict, country_name: dict) -> bytes:
+    lines = [_json_dumps({"u": u, "c": c}) for u, c in player_country.items()]
+    lines += [_json_dumps({"k": k, "n": n}) for k, n in country_name.items()]
+    return b"".join(line + b"\n" for line in lines)
+
+
+def _load_country_cache(path: str):
+    """Return (player_country, country_name, line_count, legacy_path).
+
+    Entries are replayed from the log. If there is no log yet but a legacy
+    country_cache.json is present, its entries are returned instead along with
+    its path, so the caller can write them out as a log and delete it.
+    """
+    player_country, country_name = {}, {}
+    lines = 0
+    if not os.path.exists(path):
+        legacy = os.path.join(os.path.dirname(path), "country_cache.json")
+        try:
+            existing = _read_json_file(legacy)
+        except OSError:
+            return player_country, country_name, lines, None
+        except Exception:
+            existing = {}
+        if isinstance(existing, dict):
+            player_country.update(existing.get("player_country") or {})
+            country_name.update(existing.get("country_name") or {})
+        return player_country, country_name, lines, legacy
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    rec = _json_loads(line)
+                except Exception:
+                    continue
+                if "u" in rec:
+                    player_country[rec["u"]] = rec.get("c")
+                elif "k" in rec:
+                    country_name[rec["k"]] = rec.get("n")
+    except OSError:
+        pass
+    return player_country, country_name, lines, None
+
+
+# Chess.com's names for codes whose ISO 3166 name reads differently.
+_CHESSCOM_COUNTRY_NAMES = {
+    "BN": "Brunei",
+    "BO": "Bolivia",
+    "GB": "United Kingdom",
+    "IR": "Iran",
+    "KP": "North Korea",
+    "KR": "South Korea",
+    "LA": "Laos",
+    "MD": "Moldova",
+    "RU": "Russia",
+    "SY": "Syria",
+    "TR": "Turkey",
+    "TW": "Taiwan",
+    "TZ": "Tanzania",
+    "US": "United States",
+    "VE": "Venezuela",
+    "VN": "Vietnam",
+}
+
+
+@lru_cache(maxsize=1)
+def _iso_country_names() -> dict:
+    """Return {alpha_2: name} from pycountry when installed, else {}.
+
+    Only names that read like Chess.com's are kept: the overrides above, plus
+    plain ISO names. Formal ones ("Iran, Islamic Republic of") and any too
+    long for the 20-character CC column are left out and still go to the API,
+    as do Chess.com's own codes (e.g. "XE").
+    """
+    if pycountry is None:
+        return {}
+    names = {}
+    for c in pycountry.countries:
+        name = getattr(c, "common_name", None) or c.name
+        if "," in name or "(" in name or len(name) > 20:
+            continue
+        names[c.alpha_2] = name
+    names.update(_CHESSCOM_COUNTRY_NAMES)
+    return names
+
+
+# Country-cache writes run on background threads so the CLI does not wait on
+# the disk. Each writer joins its predecessor first, so appends and compactions
+# land in the order they were issued, and exit waits for any still in flight.
+_country_cache_writers: list[threading.Thread] = []
+
+
+def _write_country_cache(path: str, data: bytes, compact: bool, prev, remove) -> None:
+    if prev is not None:
+        prev.join()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if compact:
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        else:
+            with open(path, "ab") as f:
+                f.write(data)
+        if remove:
+            os.remove(remove)
+    except Exception:
+        pass
+
+
+def _save_country_cache(path: str, data: bytes, compact: bool = False, remove=None) -> None:
+    """Append `data` to (or, if `compact`, replace) the log on a background thread.
+
+    `remove` names a file to delete once the write has succeeded.
+    """
+    prev = _country_cache_writers[-1] if _country_cache_writers else None
+    writer = threading.Thread(
+        target=_write_country_cache, args=(path, data, compact, prev, remove)
+    )
+    writer.start()
+    _country_cache_writers.append(writer)
+
 
+def _join_country_cache_writers() -> None:
+    while _country_cache_writers:
+        _country_cache_writers.pop().join()
+
+
+atexit.register(_join_country_cache_writers)
 
 
 def get_country_lookup(our_username: str, opp_usernames: list, verbose: bool = False) -> dict:
     """Return {username.lower(): "🇺🇸 United States"} for all opponents, fetching uncached ones."""
     path = _country_cache_path(our_username)
-    existing = {}
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                existing = json.load(f)
-        except Exception:
-            pass
+    player_country, country_name, log_lines, legacy = _load_country_cache(path)
 
-    player_country = existing.get("player_country", {})
-    country_name = existing.get("country_name", {})
+    # Lowercase and dedupe once; the API and both caches are keyed on it
+    opp_lower = {u.lower() for u in opp_usernames if u}
 
     # Fetch player country codes for any uncached opponents
-    uncached_players = [u for u in opp_usernames if u and u.lower() not in player_country]
-    for opp in uncached_players:
-        try:
-            resp = requests.get(
-                f"https://api.chess.com/pub/player/{opp}",
-                headers={"User-Agent": "chess-sessions/1.0"}, timeout=10,
-            )
-            resp.raise_for_status()
-            country_url = resp.json().get("country", "")
+    new_players = {}
+    uncached_players = sorted(u for u in opp_lower if u not in player_country)
+    bodies = _fetch_json_many(
+        [f"https://api.chess.com/pub/player/{opp}" for opp in uncached_players]
+    )
+    for opp, body in zip(uncached_players, bodies):
+        code = None
+        if isinstance(body, dict):
+            country_url = body.get("country", "")
             code = country_url.rstrip("/").split("/")[-1] if country_url else None
-            player_country[opp.lower()] = code
             dprint(verbose, f"Fetched country for {opp}: {code}")
-        except Exception:
-            player_country[opp.lower()] = None
-
-    # Fetch full country names for any codes not yet in the name cache
-    unknown_codes = {c for c in player_country.values() if c and c not in country_name}
-    for code in unknown_codes:
-        try:
-            resp = requests.get(
-                f"https://api.chess.com/pub/country/{code}",
-                headers={"User-Agent": "chess-sessions/1.0"}, timeout=10,
+        new_players[opp] = code
+    player_country.update(new_players)
+
+    # Fetch full country names for any codes not yet in the name cache or
+    # the ISO table
+    iso_names = _iso_country_names()
+    unknown_codes = sorted({
+        c for c in player_country.values()
+        if c and c not in country_name and c not in iso_names
+    })
+    bodies = _fetch_json_many(
+        [f"https://api.chess.com/pub/country/{code}" for code in unknown_codes]
+    )
+    new_names = {}
+    for code, body in zip(unknown_codes, bodies):
+        if isinstance(body, dict):
+            new_names[code] = body.get("name", code)
+            dprint(verbose, f"Fetched name for {code}: {new_names[code]}")
+        else:
+            new_names[code] = code
+    country_name.update(new_names)
+
+    # Persist only what was fetched; rewrite the log once it is mostly stale,
+    # or when carrying over a legacy JSON cache
+    if new_players or new_names or legacy:
+        entries = len(player_country) + len(country_name)
+        if legacy or log_lines + len(new_players) + len(new_names) > 2 * entries:
+            _save_country_cache(
+                path, _country_entry_lines(player_country, country_name),
+                compact=True, remove=legacy,
             )
-            resp.raise_for_status()
-            country_name[code] = resp.json().get("name", code)
-            dprint(verbose, f"Fetched name for {code}: {country_name[code]}")
-        except Exception:
-            country_name[code] = code
-
-    # Persist updated cache
-    if uncached_players or unknown_codes:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        tmp = f"{path}.tmp"
-        try:
-            existing["player_country"] = player_country
-            existing["country_name"] = country_name
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(existing, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, path)
-        except Exception:
-            pass
+        else:
+            _save_country_cache(path, _country_entry_lines(new_players, new_names))
 
     # Build display strings: "🇺🇸 United States"
     result = {}
-    for opp in opp_usernames:
-        if not opp:
-            continue
-        code = player_country.get(opp.lower())
-        if code:
-            result[opp.lower()] = country_name.get(code, code)
-        else:
-            result[opp.lower()] = ""
+    for opp in opp_lower:
+        code = player_country.get(opp)
+        result[opp] = (country_name.get(code) or iso_names.get(code, code)) if code else ""
     return result
\ No newline at end of file
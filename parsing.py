@@ -1,10 +1,35 @@
 import datetime as dt
 import math
-
-from rich.style import Style
-from rich.text import Text
-
-from config import PGN_DATE_RE, PGN_START_RE, PGN_END_RE, PGN_TAG_RE
+from dataclasses import dataclass
+
+from config import PGN_TAG_RE, PGN_TIME_TAG_RE
+
+_UTC = dt.timezone.utc
+_MISSING = object()
+
+# Chess.com per-side result codes -> W/L/D; anything unlisted counts as a draw.
+RESULT_MAP = {
+    "win": "W",
+    "checkmated": "L",
+    "resigned": "L",
+    "timeout": "L",
+    "abandoned": "L",
+    "lose": "L",
+    "agreed": "D",
+    "repetition": "D",
+    "stalemate": "D",
+    "insufficient": "D",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class GameRow:
+    """One accepted game: UTC start/end, W/L/D result, our side, and the raw game."""
+    start: dt.datetime
+    end: dt.datetime
+    res: str
+    side: str
+    game: dict
 
 
 def dprint(enabled: bool, msg: str) -> None:
@@ -13,23 +38,41 @@ def dprint(enabled: bool, msg: str) -> None:
         print(f"[{now}] {msg}")
 
 
+def _pgn_datetime(date_s: str, time_s: str) -> dt.datetime:
+    """Build a UTC datetime from PGN 'YYYY.MM.DD' and 'H:MM:SS' strings."""
+    hour, minute, second = time_s.split(":")
+    return dt.datetime(
+        int(date_s[0:4]), int(date_s[5:7]), int(date_s[8:10]),
+        int(hour), int(minute), int(second),
+        tzinfo=_UTC,
+    )
+
+
 def parse_pgn_times(pgn: str, verbose: bool = False):
     """Return (start_utc, end_utc) datetimes parsed from PGN tags, or (None, None)."""
-    m_date = PGN_DATE_RE.search(pgn)
-    m_start = PGN_START_RE.search(pgn)
-    m_end = PGN_END_RE.search(pgn)
-
-    if not (m_date and m_start and m_end):
+    # A plain substring test cheaply rejects PGNs with no time info at all.
+    if not pgn or '[UTCDate "' not in pgn:
         dprint(verbose, "PGN missing time info")
         return None, None
 
-    start = dt.datetime.strptime(
-        f"{m_date.group(1)} {m_start.group(1)}", "%Y.%m.%d %H:%M:%S"
-    ).replace(tzinfo=dt.timezone.utc)
+    # The alternation only matches the three time tags (UTCDate, UTCTime,
+    # EndTime), so other tag-pairs cost no match objects at all.
+    found = {}
+    for m in PGN_TIME_TAG_RE.finditer(pgn, 0, _pgn_header_end(pgn)):
+        found.setdefault(m.group(1), m.group(2))
+        if len(found) == 3:
+            break
+    else:
+        dprint(verbose, "PGN missing time info")
+        return None, None
 
-    end = dt.datetime.strptime(
-        f"{m_date.group(1)} {m_end.group(1)}", "%Y.%m.%d %H:%M:%S"
-    ).replace(tzinfo=dt.timezone.utc)
+    date_s = found["UTCDate"]
+    try:
+        start = _pgn_datetime(date_s, found["UTCTime"])
+        end = _pgn_datetime(date_s, found["EndTime"])
+    except ValueError:
+        dprint(verbose, "PGN missing time info")
+        return None, None
 
     if end < start:
         end += dt.timedelta(days=1)
@@ -37,6 +80,27 @@ def parse_pgn_times(pgn: str, verbose: bool = False):
     return start, end
 
 
+def get_game_times(game: dict, verbose: bool = False):
+    """Return (start_utc, end_utc) for a game, or (None, None).
+
+    Prefers the archive's epoch `start_time`/`end_time` fields and only falls
+    back to the PGN tags for whatever is missing (live games carry no
+    `start_time`).
+    """
+    start_ts = game.get("start_time")
+    end_ts = game.get("end_time")
+    if start_ts and end_ts:
+        return (
+            dt.datetime.fromtimestamp(start_ts, _UTC),
+            dt.datetime.fromtimestamp(end_ts, _UTC),
+        )
+
+    start, end = parse_pgn_times(game.get("pgn", ""), verbose)
+    if start and end_ts:
+        end = dt.datetime.fromtimestamp(end_ts, _UTC)
+    return start, end
+
+
 def parse_pgn_tags(pgn: str) -> dict:
     """Parse PGN tag-pairs into a dict."""
     if not pgn:
@@ -44,6 +108,50 @@ def parse_pgn_tags(pgn: str) -> dict:
     return {k: v for k, v in PGN_TAG_RE.findall(pgn)}
 
 
+def _pgn_header_end(pgn: str) -> int:
+    """Index where the tag-pair header ends (the first blank line)."""
+    end = pgn.find("\n\n")
+    return len(pgn) if end < 0 else end
+
+
+class PGNTags:
+    """Read-only, lazily parsed view of a PGN's tag-pairs.
+
+    Lookups scan forward only as far as the requested tag, memoizing every
+    tag passed on the way, so reading a handful of tags never builds the
+    full tag dict. Only the header is scanned, never the movetext.
+    """
+
+    __slots__ = ("_scan", "_seen")
+
+    def __init__(self, pgn: str):
+        self._scan = PGN_TAG_RE.finditer(pgn, 0, _pgn_header_end(pgn)) if pgn else None
+        self._seen = {}
+
+    def get(self, key: str, default=None):
+        seen = self._seen
+        if key in seen:
+            return seen[key]
+        if self._scan is not None:
+            for m in self._scan:
+                k, v = m.group(1), m.group(2)
+                if k not in seen:
+                    seen[k] = v
+                    if k == key:
+                        return v
+            self._scan = None
+        return default
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
 def _to_int(s):
     try:
         return int(str(s).strip())
@@ -68,31 +176,36 @@ def _parse_rating_diff(s):
         return None
 
 
-def extract_game_details(game: dict, username: str):
-    """Return a dict of per-game details for display."""
-    username_l = (username or "").lower()
-    white_u = game.get("white", {}).get("username", "")
-    black_u = game.get("black", {}).get("username", "")
-    white_l = white_u.lower()
-    black_l = black_u.lower()
+def extract_game_details(game: dict, username: str, me_side=None):
+    """Return a dict of per-game details for display.
+
+    Pass ``me_side`` ('W'/'B') when it is already known, e.g. from
+    ``get_game_result``, to skip re-matching ``username`` against both players.
+    """
+    white = game.get("white", {})
+    black = game.get("black", {})
+
+    if me_side is None:
+        username_l = (username or "").lower()
+        if username_l == white.get("username", "").lower():
+            me_side = "W"
+        elif username_l == black.get("username", "").lower():
+            me_side = "B"
 
-    me_side = None
     opp_user = None
     opp_side = None
-    if username_l == white_l:
-        me_side = "W"
+    if me_side == "W":
         opp_side = "B"
-        opp_user = black_u
-    elif username_l == black_l:
-        me_side = "B"
+        opp_user = black.get("username", "")
+    elif me_side == "B":
         opp_side = "W"
-        opp_user = white_u
+        opp_user = white.get("username", "")
 
-    white_rating_after = _to_int(game.get("white", {}).get("rating"))
-    black_rating_after = _to_int(game.get("black", {}).get("rating"))
+    white_rating_after = _to_int(white.get("rating"))
+    black_rating_after = _to_int(black.get("rating"))
 
     pgn = game.get("pgn", "")
-    tags = parse_pgn_tags(pgn)
+    tags = PGNTags(pgn)
 
     white_elo_tag = _to_int(tags.get("WhiteElo"))
     black_elo_tag = _to_int(tags.get("BlackElo"))
@@ -168,51 +281,54 @@ def extract_game_details(game: dict, username: str):
 def get_game_result(game: dict, username: str):
     """Return (result_letter, side) where side is 'W'/'B'."""
     username = (username or "").lower()
-    white = game.get("white", {}).get("username", "").lower()
-    black = game.get("black", {}).get("username", "").lower()
-
-    white_result = game.get("white", {}).get("result", "")
-    black_result = game.get("black", {}).get("result", "")
+    white = game.get("white", {})
+    black = game.get("black", {})
 
-    if username == white:
+    if username == white.get("username", "").lower():
         side = "W"
-        res = white_result
-    elif username == black:
+        res = white.get("result", "")
+    elif username == black.get("username", "").lower():
         side = "B"
-        res = black_result
+        res = black.get("result", "")
     else:
         return "D", None
 
-    if res == "win":
-        return "W", side
-    if res in {"checkmated", "resigned", "timeout", "abandoned", "lose"}:
-        return "L", side
-    if res in {"agreed", "repetition", "stalemate", "insufficient"}:
-        return "D", side
+    return RESULT_MAP.get(res, "D"), side
 
-    return "D", side
 
+# Rich is only imported by the rendering helpers below, so fetching/parsing
+# code that never renders does not pay for it at import time.
 
-def colorize_result(res: str, side: str) -> Text:
+# Badge styles for every (result, dark background) pair, built on first use.
+_RESULT_STYLES = None
+
+
+def _result_style(res: str, side: str):
+    global _RESULT_STYLES
+    if _RESULT_STYLES is None:
+        from rich.style import Style
+        _RESULT_STYLES = {
+            (r, dark): Style(color=color, bgcolor="#333333" if dark else "#eeeeee")
+            for r, color in (("W", "#00aa00"), ("L", "#ff0000"), ("D", "#666666"))
+            for dark in (False, True)
+        }
+    return _RESULT_STYLES[(res if res in ("W", "L") else "D"), side == "B"]
+
+
+def colorize_result(res: str, side: str):
     """Return a single padded, colorized result letter with side-indicating background."""
-    bg = "#333333" if side == "B" else "#eeeeee"
-    if res == "W":
-        style = Style(color="#00aa00", bgcolor=bg)
-    elif res == "L":
-        style = Style(color="#ff0000", bgcolor=bg)
-    else:
-        style = Style(color="#666666", bgcolor=bg)
+    from rich.text import Text
 
-    text = Text()
-    text.append(f" {res} ", style=style)
-    return text
+    return Text(f" {res} ", style=_result_style(res, side))
 
 
 def colorize_results_by_session(sessions_by_day):
     """Render a W/L/D strip grouped by session and day."""
+    from rich.text import Text
+
     text = Text()
     for day in sorted(sessions_by_day):
         for sess in sessions_by_day[day]:
             for g in sess:
-                text.append_text(colorize_result(g[2], g[3]))
-    return text
\ No newline at end of file
+                text.append(f" {g.res} ", style=_result_style(g.res, g.side))
+    return text
@@ -7,17 +7,19 @@ Session = consecutive games with gaps <= --gap minutes.
 
 import argparse
 import datetime as dt
-from collections import defaultdict
+from collections import Counter
+from operator import attrgetter
 
 import rich.box
-from rich.console import Console
+from rich.console import Console, Group
+from rich.rule import Rule
 from rich.table import Table
 from rich.text import Text
 
 from config import DEFAULT_USER, LOCAL_TZ
 from parsing import (
-    dprint,
-    parse_pgn_times,
+    GameRow,
+    get_game_times,
     extract_game_details,
     get_game_result,
     colorize_result,
@@ -25,9 +27,10 @@ from parsing import (
 )
 from fetching import (
     clear_user_cache,
-    fetch_month_games,
+    fetch_games_for_months,
     fetch_most_recent_games,
     fetch_games_for_range,
+    flush_pending_writes_async,
     month_iter_backwards,
     is_skippable,
     get_country_lookup,
@@ -36,24 +39,30 @@ from fetching import (
 
 def _build_wld_summary(results):
     """Build a compact summary like '7 games // 6-1-0 (86%) // White: 3-1-0 (75%) // Black: 3-0-0 (100%)'"""
-    wins = sum(1 for r, _ in results if r == "W")
-    losses = sum(1 for r, _ in results if r == "L")
-    draws = sum(1 for r, _ in results if r == "D")
-    total = wins + losses + draws
-    pct = round(wins / total * 100) if total else 0
+    # One counting pass over (result, side) pairs instead of a pass per tally.
+    counts = Counter(results)
 
-    w_wins = sum(1 for r, s in results if r == "W" and s == "W")
-    w_losses = sum(1 for r, s in results if r == "L" and s == "W")
-    w_draws = sum(1 for r, s in results if r == "D" and s == "W")
+    w_wins = counts["W", "W"]
+    w_losses = counts["L", "W"]
+    w_draws = counts["D", "W"]
     w_total = w_wins + w_losses + w_draws
     w_pct = round(w_wins / w_total * 100) if w_total else 0
 
-    b_wins = sum(1 for r, s in results if r == "W" and s == "B")
-    b_losses = sum(1 for r, s in results if r == "L" and s == "B")
-    b_draws = sum(1 for r, s in results if r == "D" and s == "B")
+    b_wins = counts["W", "B"]
+    b_losses = counts["L", "B"]
+    b_draws = counts["D", "B"]
     b_total = b_wins + b_losses + b_draws
     b_pct = round(b_wins / b_total * 100) if b_total else 0
 
+    by_result = Counter()
+    for (r, _), n in counts.items():
+        by_result[r] += n
+    wins = by_result["W"]
+    losses = by_result["L"]
+    draws = by_result["D"]
+    total = wins + losses + draws
+    pct = round(wins / total * 100) if total else 0
+
     t = Text()
     t.append(f"{total} games", style="bold")
     t.append("  //  ", style="dim")
@@ -116,6 +125,7 @@ def main():
     if args.no_cache:
         clear_user_cache(args.user)
 
+    username_l = args.user.lower()
     now = dt.datetime.now(LOCAL_TZ)
     day_shift = dt.timedelta(hours=args.day_cutoff_hour)
     today = (now - day_shift).date()
@@ -133,9 +143,9 @@ def main():
             cutoff = today - dt.timedelta(days=args.days - 1)
 
         if cutoff is None:
-            games = []
-            for y, m in month_iter_backwards(today):
-                games.extend(fetch_month_games(args.user, y, m, args.verbose))
+            games = fetch_games_for_months(
+                args.user, month_iter_backwards(today), args.verbose
+            )
         else:
             games = fetch_games_for_range(args.user, cutoff, today, args.verbose)
 
@@ -144,79 +154,83 @@ def main():
             if is_skippable(g):
                 continue
 
-            start, end = parse_pgn_times(g.get("pgn", ""), args.verbose)
+            start, end = get_game_times(g, args.verbose)
             if not start or not end:
                 continue
 
-            local_start = start.astimezone(LOCAL_TZ)
-            game_day = (local_start - day_shift).date()
+            game_day = (start.astimezone(LOCAL_TZ) - day_shift).date()
 
             if cutoff is None or (cutoff <= game_day <= today):
-                res, side = get_game_result(g, args.user)
-                parsed.append((start, end, res, side, g))
+                res, side = get_game_result(g, username_l)
+                parsed.append(GameRow(start, end, res, side, g))
 
-        parsed.sort(key=lambda x: x[0])
+        # Each month's archive is already chronological, so this is a merge of
+        # a few sorted runs, which timsort handles in near-linear time.
+        parsed.sort(key=attrgetter("start"))
 
         if args.games is not None and args.games > 0:
             parsed = parsed[-args.games:]
 
+    # All months are fetched; write their caches while the rest is rendered.
+    flush_pending_writes_async()
+
     if not parsed:
         console.print("No games found.")
         return
 
-    # Pre-fetch country codes for all opponents (uses local cache, fetches misses)
-    username_l = args.user.lower()
-    opp_usernames = set()
-    for _, _, _, _, g in parsed:
-        w = g.get("white", {}).get("username", "")
-        b = g.get("black", {}).get("username", "")
-        if w.lower() == username_l:
-            opp_usernames.add(b)
-        elif b.lower() == username_l:
-            opp_usernames.add(w)
+    # Per-game details are needed by both the Elo scan and the detail table;
+    # parse each game's PGN at most once (keyed by the raw game's identity).
+    details_by_id = {}
+
+    def details_for(row):
+        key = id(row.game)
+        details = details_by_id.get(key)
+        if details is None:
+            details = details_by_id[key] = extract_game_details(
+                row.game, args.user, row.side
+            )
+        return details
+
+    # Pre-fetch country codes for all opponents (uses local cache, fetches misses);
+    # row.side was resolved during parsing, so no usernames are re-matched here.
+    opp_usernames = {
+        row.game.get("black" if row.side == "W" else "white", {}).get("username", "")
+        for row in parsed
+        if row.side is not None
+    }
     country_lookup = get_country_lookup(args.user, list(opp_usernames), args.verbose)
 
-    # ── Group into sessions ──────────────────────────────────────────
-    sessions = []
+    # ── Group into sessions, bucketed by day ────────────────────────
+    # A session belongs to the day it starts on. Games are in start order, so
+    # days arrive in order too and the dict's insertion order is the display
+    # order; each game is visited once for both groupings.
+    sessions_by_day = {}
     gap = dt.timedelta(minutes=args.gap)
-    cur = []
+    cur = None
+    cur_day = None
 
     for game in parsed:
-        if not cur:
-            cur = [game]
-            continue
-        if game[0] - cur[-1][1] <= gap:
+        if cur and game.start - cur[-1].end <= gap:
             cur.append(game)
-        else:
-            sessions.append(cur)
-            cur = [game]
-    if cur:
-        sessions.append(cur)
-
-    # Group by day
-    sessions_by_day = defaultdict(list)
-    for sess in sessions:
-        day = (sess[0][0].astimezone(LOCAL_TZ) - day_shift).date()
-        sessions_by_day[day].append(sess)
+            continue
+        cur = [game]
+        day = (game.start.astimezone(LOCAL_TZ) - day_shift).date()
+        if day != cur_day:
+            cur_day = day
+            day_sessions = sessions_by_day[day] = []
+        day_sessions.append(cur)
 
     # ── Compute overall summary stats ────────────────────────────────
-    flat = [
-        (g[2], g[3])
-        for day in sorted(sessions_by_day)
-        for s in sessions_by_day[day]
-        for g in s
-    ]
-
     # Elo range
     elo_start = None
     elo_end = None
     for g in parsed:
-        details = extract_game_details(g[4], args.user)
+        details = details_for(g)
         if details.get("my_rating_before") is not None:
             elo_start = details["my_rating_before"]
             break
     for g in reversed(parsed):
-        details = extract_game_details(g[4], args.user)
+        details = details_for(g)
         if details.get("my_rating_after") is not None:
             elo_end = details["my_rating_after"]
             break
@@ -231,7 +245,7 @@ def main():
     console.print()
 
     # Compact summary line
-    console.print(_build_wld_summary(flat))
+    console.print(_build_wld_summary((g.res, g.side) for g in parsed))
 
     if elo_start is not None and elo_end is not None and elo_delta is not None:
         sign = "+" if elo_delta >= 0 else ""
@@ -244,21 +258,24 @@ def main():
 
     # ── Per-day output ───────────────────────────────────────────────
     prev_my_rating = None
-    for day in sorted(sessions_by_day):
-        console.print()
-        console.print()
-        console.print(f"[bold]{day.strftime('%A, %B %-d')}[/bold]")
-
-        for sess in sessions_by_day[day]:
-            start = sess[0][0].astimezone(LOCAL_TZ)
-            end = sess[-1][1].astimezone(LOCAL_TZ)
+    for day, day_sessions in sessions_by_day.items():
+        # Collect the whole day and print it as one Group (one render/flush).
+        pieces = [
+            Text(),
+            Text(),
+            Text(day.strftime('%A, %B %-d'), style="bold"),
+        ]
+
+        for sess in day_sessions:
+            start = sess[0].start.astimezone(LOCAL_TZ)
+            end = sess[-1].end.astimezone(LOCAL_TZ)
 
             time_str = (
                 f"{start.strftime('%-I:%M%p').lower()} to {end.strftime('%-I:%M%p').lower()}"
             )
-            console.rule(style="#444444")
-            console.print(Text(time_str, style="#999999"))
-            console.rule(style="#444444")
+            pieces.append(Rule(style="#444444"))
+            pieces.append(Text(time_str, style="#999999"))
+            pieces.append(Rule(style="#444444"))
 
             if args.details:
                 gt = Table(
@@ -277,9 +294,9 @@ def main():
                 gt.add_column("My Elo", justify="right", width=14)
 
                 for gg in sess:
-                    d = extract_game_details(gg[4], args.user)
+                    d = details_for(gg)
 
-                    res_badge = colorize_result(gg[2], d.get("me_side"))
+                    res_badge = colorize_result(gg.res, d.get("me_side"))
 
                     acc = d.get("my_accuracy")
                     if isinstance(acc, float):
@@ -313,7 +330,7 @@ def main():
                     my_after = d.get("my_rating_after")
 
                     if my_after is not None:
-                        result_letter = gg[2]
+                        result_letter = gg.res
                         if result_letter == "W":
                             elo_style = "green"
                         elif result_letter == "L":
@@ -342,7 +359,9 @@ def main():
                         my_elo_cell
                     )
 
-                console.print(gt)
+                pieces.append(gt)
+
+        console.print(Group(*pieces))
 
     console.print()
 